@@ -2,8 +2,14 @@
 """
 Script to check for new presidential polls from the sondages-commission-index catalog.
 Can be run locally to preview what issues would be created.
+
+The scheduled workflow (.github/workflows/check-new-polls.yml) only looks at the
+catalog entries added since .last_poll_count. This script previews those, then also
+lists every catalog poll whose PDF is not referenced in polls.csv yet, which catches
+entries inserted out of order or missed by the counter.
 """
 import csv
+import io
 import json
 import sys
 from pathlib import Path
@@ -15,6 +21,8 @@ CATALOG_URL = (
 CATALOG_REPO_URL = "https://github.com/MieuxVoter/sondages-commission-index"
 ROOT = Path(__file__).resolve().parent
 LAST_COUNT_FILE = ROOT / ".last_poll_count"
+# The catalog also lists presidential polls from before this repository's coverage
+TRACKING_START_YEAR = 2024
 
 
 def get_last_poll_count():
@@ -31,7 +39,7 @@ def save_poll_count(count):
 
 
 def get_existing_polls():
-    """Get list of existing poll IDs from polls.csv - DEPRECATED, kept for reference"""
+    """Get the set of poll IDs and PDF filenames already referenced in polls.csv"""
     existing = set()
     polls_csv = ROOT / "polls.csv"
     if polls_csv.exists():
@@ -51,23 +59,37 @@ def get_catalog_polls():
     """Fetch presidential polls from the catalog"""
     print(f"📥 Fetching catalog from: {CATALOG_URL}")
 
+    polls = []
     try:
         with urlopen(CATALOG_URL) as response:
-            content = response.read().decode("utf-8")
+            # Parse rows as the response is read, without buffering the whole catalog
+            reader = csv.DictReader(io.TextIOWrapper(response, encoding="utf-8", newline=""))
+            for row in reader:
+                category = row.get("categorie", "").strip()
+                if category == "Pres":
+                    polls.append(row)
     except Exception as e:
         print(f"❌ Error fetching catalog: {e}")
         return []
 
-    polls = []
-    lines = content.splitlines()
-    reader = csv.DictReader(lines)
+    return polls
 
-    for row in reader:
-        category = row.get("categorie", "").strip()
-        if category == "Pres":
-            polls.append(row)
 
-    return polls
+def find_new_polls(catalog_polls, existing, min_year=TRACKING_START_YEAR):
+    """Return catalog polls whose PDF is not referenced in polls.csv yet, in catalog order.
+
+    Entries whose year is before min_year predate the repository's coverage and are
+    ignored; entries without a usable year are kept.
+    """
+    new_polls = []
+    for poll in catalog_polls:
+        if poll.get("filename", "").strip() in existing:
+            continue
+        year = poll.get("year", "").strip()
+        if min_year is not None and year.isdigit() and int(year) < min_year:
+            continue
+        new_polls.append(poll)
+    return new_polls
 
 
 def display_poll_summary(poll_data):
@@ -101,20 +123,18 @@ def main():
     current_count = len(catalog_polls)
     print(f"📊 Current presidential polls in catalog: {current_count}")
 
-    # Calculate new polls
+    # Calculate new polls, as the scheduled workflow does
     new_poll_count = current_count - last_count
 
     if new_poll_count <= 0:
-        print(f"\n✅ No new polls detected!")
+        print(f"\n✅ No new polls detected by the workflow counter!")
         print(f"   Count unchanged or decreased (was {last_count}, now {current_count})")
-        return 0
+    else:
+        print(f"✨ New polls detected: {new_poll_count}")
 
-    print(f"✨ New polls detected: {new_poll_count}")
+        # Get the newest polls (last N polls from catalog)
+        new_polls = catalog_polls[-new_poll_count:]
 
-    # Get the newest polls (last N polls from catalog)
-    new_polls = catalog_polls[-new_poll_count:]
-
-    if new_polls:
         print(f"\n{'=' * 70}")
         print(f"📝 The following {min(len(new_polls), 10)} issue(s) would be created:")
         print(f"{'=' * 70}")
@@ -122,7 +142,6 @@ def main():
         for i, poll in enumerate(new_polls[:10], 1):  # Show max 10
             print(f"\n{i}. ", end="")
             display_poll_summary(poll)
-            filename = poll.get("filename", "")
             pdf_url = poll.get("url", "")
             print(f"     PDF URL: {pdf_url}")
             print(f"     Catalog: {CATALOG_REPO_URL}")
@@ -137,6 +156,18 @@ def main():
         print(f"\n💾 Counter will be updated from {last_count} to {current_count} after issues are created")
         print(f"{'=' * 70}\n")
 
+    # Diff against polls.csv: not used by the workflow, so no issue is created for these
+    unreferenced = find_new_polls(catalog_polls, get_existing_polls())
+    print(f"\n{'=' * 70}")
+    print(f"🔎 Catalog polls since {TRACKING_START_YEAR} not referenced in polls.csv: {len(unreferenced)}")
+    print(f"   (the workflow does not create issues from this list)")
+    print(f"{'=' * 70}")
+    for poll in unreferenced[:10]:
+        display_poll_summary(poll)
+    if len(unreferenced) > 10:
+        print(f"\n... and {len(unreferenced) - 10} more polls")
+    print()
+
     # Show some recent catalog entries for reference
     if catalog_polls:
         print(f"\n{'=' * 70}")
@@ -1,4 +1,7 @@
-import os
+import csv
+import io
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
 import numpy as np
 import pandas as pd
@@ -7,84 +10,126 @@ import pandas as pd
 FOLDER = "polls"
 POLL_CSV = "polls.csv"
 SAMPLE_COLS = ["sous_echantillon3", "sous_echantillon2", "sous_echantillon1"]
+COLUMNS = ["candidat", "intentions", "erreur_sup", "erreur_inf"]
 
 
 def compute_confidence_intervals(intentions, sample, z=1.96):
     """
-    Calcule l'intervalle de confiance pour une Series de comptes bruts.
+    Calcule l'intervalle de confiance pour un tableau d'intentions.
 
     Args:
-        intentions (int): Comptes bruts d'intentions.
-        sample (int): Taille totale de l'échantillon.
+        intentions (np.ndarray): Intentions de vote, en pourcentage.
+        sample (int | np.ndarray): Taille de l'échantillon, commune ou par intention.
         z (float): Valeur critique pour le niveau de confiance.
 
     Returns:
-        tuple: (lower_bound, upper_bound) comme pd.Series.
+        tuple: (lower_bound, upper_bound) comme np.ndarray.
     """
 
-    proportion = intentions / 100
-    se = (proportion * (1 - proportion) / sample) ** 0.5
+    proportion = np.asarray(intentions, dtype=float) / 100
+    se = np.sqrt(proportion * (1 - proportion) / sample)
     margin_of_error = z * se
-    # lower_bound = proportion - margin_of_error
-    # upper_bound = proportion + margin_of_error
-    # return round(lower_bound.values[0] * 100, 2), round(upper_bound.values[0] * 100, 2)
-    return (np.round(-margin_of_error * 100, 2) if proportion > margin_of_error else proportion), np.round(
-        margin_of_error * 100, 2
-    )
+    lower_bound = np.where(proportion > margin_of_error, np.round(-margin_of_error * 100, 2), proportion)
+    return lower_bound, np.round(margin_of_error * 100, 2)
 
 
-def get_poll_ids():
-    """Get all ids within the poll Folder"""
-    poll_ids = []
-    for file in os.listdir(FOLDER):
-        if file.endswith(".csv"):
-            id = file[:-4]
-            poll_ids.append(id)
-
-    return poll_ids
-
-
-polls_df = pd.read_csv(POLL_CSV)
-poll_ids = polls_df["poll_id"].tolist()
+def read_poll(id):
+    """
+    Lit un sondage : couples (candidat, intentions) bruts et intentions converties en float.
 
-for id in poll_ids:
-    sub_df = polls_df[polls_df["poll_id"] == id]
+    Returns:
+        tuple: (rows, values), ou None si le fichier est absent ou illisible.
+    """
     try:
-        poll_df = pd.read_csv(f"{FOLDER}/{id}.csv")
-        intentions = poll_df["intentions"]
+        with open(f"{FOLDER}/{id}.csv", encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            # Les marges d'erreur existantes sont recalculées : inutile de les lire
+            candidat, intentions = header.index("candidat"), header.index("intentions")
+            # Une cellule manquante (ligne plus courte que l'en-tête) est traitée comme vide
+            rows = [
+                (
+                    row[candidat] if candidat < len(row) else "",
+                    row[intentions] if intentions < len(row) else "",
+                )
+                for row in reader
+                if row
+            ]
     except FileNotFoundError:
-        continue
+        return None
+    except ValueError as e:
+        # Fichier vide ou colonne candidat/intentions absente : seul ce sondage est écarté
+        print(f"Erreur pour le sondage {id} : {e}")
+        return None
 
+    # Conversion par sondage : une valeur invalide n'écarte que ce sondage
     try:
-        for col in SAMPLE_COLS:
-
-            has_no_empty_col = not sub_df[col].empty
-            has_no_nan_everywhere = not sub_df[col].isna().all()
-            if has_no_empty_col and has_no_nan_everywhere:
-                sample = sub_df[col].values[0]
-                break
-            else:
-                continue
-    except KeyError:
-        continue
+        values = [float(value or "nan") for _, value in rows]
+    except ValueError as e:
+        print(f"Erreur pour le sondage {id} : {e}")
+        return None
+    return rows, values
+
+
+def format_error(value):
+    """Formate une marge d'erreur comme pandas.to_csv (vide si inconnue)."""
+    return "" if np.isnan(value) else str(float(value))
 
+
+def write_poll(id, rows, erreur_sup, erreur_inf):
+    """Écrit les résultats d'un sondage avec ses marges d'erreur, si le fichier change."""
     try:
-        erreur_inf = []
-        erreur_sup = []
-        for intention in intentions:
-            lower_bound, upper_bound = compute_confidence_intervals(intention, sample)
-            erreur_inf.append(lower_bound)
-            erreur_sup.append(upper_bound)
-
-        # Créer un nouveau DataFrame avec toutes les colonnes d'origine
-        result_df = poll_df.copy()
-        result_df["erreur_inf"] = erreur_inf
-        result_df["erreur_sup"] = erreur_sup
-
-        # Réorganiser les colonnes dans le bon ordre
-        cols = ["candidat", "intentions", "erreur_sup", "erreur_inf"]
-        result_df = result_df[cols]
-
-        result_df.to_csv(f"{FOLDER}/{id}.csv", index=False)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(COLUMNS)
+        for (candidat, intentions), sup, inf in zip(rows, erreur_sup, erreur_inf):
+            writer.writerow([candidat, intentions, format_error(sup), format_error(inf)])
+        content = buffer.getvalue()
+
+        path = Path(f"{FOLDER}/{id}.csv")
+        with path.open("r", encoding="utf-8", newline="") as f:
+            if f.read() == content:
+                return
+        with path.open("w", encoding="utf-8", newline="") as f:
+            f.write(content)
     except Exception as e:
         print(f"Erreur pour le sondage {id} : {e}")
+
+
+def main():
+    # pandas ne sert plus qu'aux métadonnées de polls.csv, lues une seule fois
+    polls_df = pd.read_csv(POLL_CSV)
+    # Premier sous-échantillon renseigné par sondage, dans l'ordre de SAMPLE_COLS
+    # (un poll_id en double garde sa première ligne, comme l'ancienne boucle)
+    samples = polls_df.drop_duplicates("poll_id").set_index("poll_id")[SAMPLE_COLS].bfill(axis=1).iloc[:, 0].dropna()
+
+    # Chaque sondage est un fichier indépendant : lectures et écritures en parallèle
+    with ThreadPoolExecutor() as executor:
+        polls = {
+            id: poll for id, poll in zip(samples.index, executor.map(read_poll, samples.index)) if poll is not None
+        }
+        sizes = [len(values) for _, values in polls.values()]
+
+        # Un seul calcul vectorisé sur l'ensemble des sondages valides
+        intentions = np.fromiter(
+            (value for _, values in polls.values() for value in values),
+            dtype=np.float64,
+            count=sum(sizes),
+        )
+        sample = np.repeat(samples[list(polls)].to_numpy(), sizes)
+        erreur_inf, erreur_sup = compute_confidence_intervals(intentions, sample)
+
+        bounds = np.cumsum(sizes)[:-1]
+        list(
+            executor.map(
+                write_poll,
+                polls.keys(),
+                (rows for rows, _ in polls.values()),
+                np.split(erreur_sup, bounds),
+                np.split(erreur_inf, bounds),
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,8 @@ for each poll including their voting intentions.
 Input: presidentielle2027.csv (merged CSV file)
 Output: presidentielle2027.json
 
-This script purposefully avoids external deps (pandas) to run in CI easily.
+This script purposefully avoids external deps (pandas) to run in CI easily;
+orjson is used for serialization when installed, with the same output.
 """
 from __future__ import annotations
 
@@ -16,9 +17,16 @@ import csv
 import json
 import sys
 from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List
 
+try:
+    import orjson
+except ImportError:  # optional, falls back to the json module
+    orjson = None
+
 
 ROOT = Path(__file__).resolve().parent
 
@@ -33,8 +41,12 @@ def load_csv(csv_path: Path) -> List[Dict[str, str]]:
     return rows
 
 
+@lru_cache(maxsize=None)
 def convert_to_int_or_float(value: str) -> int | float | None:
-    """Convert a string to int or float, return None if empty or invalid."""
+    """Convert a string to int or float, return None if empty or invalid.
+
+    Cached: sample sizes and rounded intentions take few distinct values.
+    """
     if not value or not value.strip():
         return None
     try:
@@ -46,6 +58,57 @@ def convert_to_int_or_float(value: str) -> int | float | None:
         return None
 
 
+@dataclass(slots=True)
+class PollCandidate:
+    """A candidate's results in one poll, converted to a dict only when serialized."""
+
+    candidate_id: str
+    candidat: str
+    complete_name: str
+    name: str
+    surname: str
+    parti: str
+    annonce_candidature: str
+    retrait_candidature: str
+    second_round: str
+    intentions: int | float | None
+    erreur_sup: int | float | None = None
+    erreur_inf: int | float | None = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {field: getattr(self, field) for field in self.__slots__}
+        # Only add error margins if they exist
+        if self.erreur_sup is None:
+            del data["erreur_sup"]
+        if self.erreur_inf is None:
+            del data["erreur_inf"]
+        return data
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, PollCandidate):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def build_candidate(row: Dict[str, str]) -> PollCandidate:
+    """Build the candidate entry of a poll from a merged CSV row."""
+    return PollCandidate(
+        candidate_id=row.get("candidate_id", ""),
+        candidat=row.get("candidat", ""),
+        complete_name=row.get("complete_name", ""),
+        name=row.get("name", ""),
+        surname=row.get("surname", ""),
+        parti=row.get("parti", ""),
+        annonce_candidature=row.get("annonce_candidature", ""),
+        retrait_candidature=row.get("retrait_candidature", ""),
+        second_round=row.get("second_round", ""),
+        intentions=convert_to_int_or_float(row.get("intentions", "")),
+        erreur_sup=convert_to_int_or_float(row.get("erreur_sup", "")),
+        erreur_inf=convert_to_int_or_float(row.get("erreur_inf", "")),
+    )
+
+
 def csv_to_json(csv_path: Path) -> List[Dict[str, Any]]:
     """
     Convert presidentielle2027.csv to JSON format similar to 2022.
@@ -59,67 +122,53 @@ def csv_to_json(csv_path: Path) -> List[Dict[str, Any]]:
     - population: population description
     - hypothese: hypothesis ID
     - tour: election round (1er Tour or 2nd Tour)
-    - candidats: list of candidates with their results
+    - candidats: list of PollCandidate with their results
     """
     rows = load_csv(csv_path)
 
     # Group rows by poll_id
-    polls_dict: Dict[str, Dict[str, Any]] = defaultdict(lambda: {"candidats": []})
-
+    rows_by_poll: Dict[str, List[Dict[str, str]]] = defaultdict(list)
     for row in rows:
-        poll_id = row["poll_id"]
-
-        # If this is the first row for this poll, set metadata
-        if not polls_dict[poll_id].get("poll_id"):
-            polls_dict[poll_id].update(
-                {
-                    "poll_id": poll_id,
-                    "institut": row.get("nom_institut", ""),
-                    "commanditaire": row.get("commanditaire", ""),
-                    "debut_enquete": row.get("debut_enquete", ""),
-                    "fin_enquete": row.get("fin_enquete", ""),
-                    "echantillon": convert_to_int_or_float(row.get("echantillon", "")),
-                    "population": row.get("population", ""),
-                    "hypothese": row.get("hypothese", ""),
-                    "tour": row.get("tour", ""),
-                    "rolling": row.get("rolling", ""),
-                    "media": row.get("media", ""),
-                    "filename": row.get("filename", ""),
-                }
-            )
-
-        # Add candidate data
-        intentions = convert_to_int_or_float(row.get("intentions", ""))
-        erreur_sup = convert_to_int_or_float(row.get("erreur_sup", ""))
-        erreur_inf = convert_to_int_or_float(row.get("erreur_inf", ""))
-
-        candidate_data = {
-            "candidate_id": row.get("candidate_id", ""),
-            "candidat": row.get("candidat", ""),
-            "complete_name": row.get("complete_name", ""),
-            "name": row.get("name", ""),
-            "surname": row.get("surname", ""),
-            "parti": row.get("parti", ""),
-            "annonce_candidature": row.get("annonce_candidature", ""),
-            "retrait_candidature": row.get("retrait_candidature", ""),
-            "second_round": row.get("second_round", ""),
-            "intentions": intentions,
+        rows_by_poll[row["poll_id"]].append(row)
+
+    polls_dict: Dict[str, Dict[str, Any]] = {}
+    for poll_id, poll_rows in rows_by_poll.items():
+        # Poll metadata is repeated on every row, take it from the first one
+        meta = poll_rows[0]
+        # "candidats" first keeps the key order of the published JSON
+        polls_dict[poll_id] = {
+            "candidats": [build_candidate(row) for row in poll_rows],
+            "poll_id": poll_id,
+            "institut": meta.get("nom_institut", ""),
+            "commanditaire": meta.get("commanditaire", ""),
+            "debut_enquete": meta.get("debut_enquete", ""),
+            "fin_enquete": meta.get("fin_enquete", ""),
+            "echantillon": convert_to_int_or_float(meta.get("echantillon", "")),
+            "population": meta.get("population", ""),
+            "hypothese": meta.get("hypothese", ""),
+            "tour": meta.get("tour", ""),
+            "rolling": meta.get("rolling", ""),
+            "media": meta.get("media", ""),
+            "filename": meta.get("filename", ""),
         }
 
-        # Only add error margins if they exist
-        if erreur_sup is not None:
-            candidate_data["erreur_sup"] = erreur_sup
-        if erreur_inf is not None:
-            candidate_data["erreur_inf"] = erreur_inf
-
-        polls_dict[poll_id]["candidats"].append(candidate_data)
-
     # Convert to list sorted by poll_id
     polls_list = sorted(polls_dict.values(), key=lambda x: x["poll_id"])
 
     return polls_list
 
 
+def write_json(data: List[Dict[str, Any]], json_path: Path) -> None:
+    """Write data as indented UTF-8 JSON."""
+    if orjson is not None:
+        # Let _json_default serialize PollCandidate instead of orjson's native dataclass support
+        option = orjson.OPT_INDENT_2 | orjson.OPT_PASSTHROUGH_DATACLASS
+        json_path.write_bytes(orjson.dumps(data, default=_json_default, option=option))
+        return
+    with json_path.open("w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, default=_json_default)
+
+
 def main() -> int:
     """Main entry point."""
     csv_path = ROOT / "presidentielle2027.csv"
@@ -133,8 +182,7 @@ def main() -> int:
         data = csv_to_json(csv_path)
 
         # Write JSON with nice formatting
-        with json_path.open("w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        write_json(data, json_path)
 
         print(f"Successfully converted {csv_path} to {json_path}")
         print(f"Total polls: {len(data)}")
@@ -16,25 +16,65 @@ This script purposefully avoids external deps (pandas) to run in CI easily.
 from __future__ import annotations
 
 import csv
+import os
+import re
 import sys
 import unicodedata
 from dataclasses import dataclass
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Tuple
 
 
 ROOT = Path(__file__).resolve().parent
 
-
+# Column order of the merged CSV, matching the rows built by iter_merged_rows
+FIELDNAMES = (
+    "poll_id",
+    "hypothese",
+    "nom_institut",
+    "commanditaire",
+    "debut_enquete",
+    "fin_enquete",
+    "echantillon",
+    "population",
+    "rolling",
+    "media",
+    "tour",
+    "filename",
+    "candidate_id",
+    "candidat",
+    "complete_name",
+    "name",
+    "surname",
+    "parti",
+    "annonce_candidature",
+    "retrait_candidature",
+    "second_round",
+    "intentions",
+    "erreur_sup",
+    "erreur_inf",
+)
+
+# Fancy punctuation -> ASCII equivalents, applied in a single pass by _norm
+_PUNCT_TABLE = str.maketrans({"’": "'", "`": "'", "–": "-", "—": "-", "‐": "-"})
+# Combining diacritical marks left over by NFD decomposition of Latin names
+_COMBINING_RE = re.compile(r"[\u0300-\u036f]")
+
+
+@lru_cache(maxsize=None)
 def _norm(s: str) -> str:
-    """Normalize names: strip accents, normalize hyphens/apostrophes, collapse spaces, lowercase."""
+    """Normalize names: strip accents, normalize hyphens/apostrophes, collapse spaces, lowercase.
+
+    Cached: the same few dozen candidate names recur across every poll file.
+    """
     if s is None:
         return ""
     # Replace fancy punctuation with ASCII equivalents
-    s2 = s.replace("’", "'").replace("`", "'").replace("–", "-").replace("—", "-").replace("‐", "-")
+    s2 = s.translate(_PUNCT_TABLE)
     # NFD then remove diacritics
-    s2 = unicodedata.normalize("NFD", s2)
-    s2 = "".join(ch for ch in s2 if unicodedata.category(ch) != "Mn")
+    s2 = _COMBINING_RE.sub("", unicodedata.normalize("NFD", s2))
     # Collapse whitespace
     s2 = " ".join(s2.split())
     return s2.lower().strip()
@@ -132,8 +172,8 @@ def read_poll_results(path: Path) -> List[dict]:
         return rows
 
 
-def merge(repo_root: Path = ROOT) -> List[dict]:
-    """Return merged rows as a list of dictionaries."""
+def iter_merged_rows(repo_root: Path = ROOT) -> Iterator[dict]:
+    """Yield merged rows as dictionaries, one poll at a time."""
     candidates_csv = repo_root / "candidats.csv"
     hypotheses_csv = repo_root / "hypotheses.csv"
     polls_csv = repo_root / "polls.csv"
@@ -141,8 +181,8 @@ def merge(repo_root: Path = ROOT) -> List[dict]:
 
     id_to_candidate, name_to_id = load_candidates(candidates_csv)
     hypothesis_to_names = load_hypotheses(hypotheses_csv)
+    hypothesis_to_set = {h_id: frozenset(h_names) for h_id, h_names in hypothesis_to_names.items()}
 
-    merged: List[dict] = []
     for meta in iter_polls_meta(polls_csv):
         poll_id = meta["poll_id"].strip()
         hyp = meta.get("hypothese", "").strip()
@@ -153,21 +193,21 @@ def merge(repo_root: Path = ROOT) -> List[dict]:
 
         results = read_poll_results(poll_file)
         # Validate candidates match the hypothesis set (order not enforced strictly)
-        expected = set(hypothesis_to_names.get(hyp, []))
+        expected = hypothesis_to_set.get(hyp, frozenset())
         got = {_norm(r["candidat"]) for r in results}
         # Only warn if hypothesis known and non-empty
         if expected and got != expected:
-            candidate_that_is_missing = expected - got
+            candidate_that_is_missing = set(expected - got)
             candidate_that_is_extra = got - expected
             closest_hypothesis = None
-            for h_id, h_names in hypothesis_to_names.items():
-                if got == set(h_names):
+            for h_id, h_names in hypothesis_to_set.items():
+                if got == h_names:
                     closest_hypothesis = h_id
                     break
 
             raise LookupError(
                 f"Poll {poll_id} candidates {got} differ from hypothesis {hyp} \n"
-                f"expected {expected}. \n"
+                f"expected {set(expected)}. \n"
                 f"Missing: {candidate_that_is_missing}. \n"
                 f"Extra: {candidate_that_is_extra}.\n"
                 f" Closest hypothesis match: {closest_hypothesis if closest_hypothesis is not None else "None"}."
@@ -185,89 +225,76 @@ def merge(repo_root: Path = ROOT) -> List[dict]:
             else:
                 c = id_to_candidate[cid]
             # Build merged row
-            merged.append(
-                {
-                    # poll metadata
-                    "poll_id": poll_id,
-                    "hypothese": hyp,
-                    "nom_institut": meta.get("nom_institut", ""),
-                    "commanditaire": meta.get("commanditaire", ""),
-                    "debut_enquete": meta.get("debut_enquete", ""),
-                    "fin_enquete": meta.get("fin_enquete", ""),
-                    "echantillon": meta.get("echantillon", ""),
-                    "population": meta.get("population", ""),
-                    "rolling": meta.get("rolling", ""),
-                    "media": meta.get("media", ""),
-                    "tour": meta.get("tour", ""),
-                    "filename": meta.get("filename", ""),
-                    # candidate info
-                    "candidate_id": c.candidate_id,
-                    "candidat": r.get("candidat", ""),
-                    "complete_name": c.complete_name,
-                    "name": c.name,
-                    "surname": c.surname,
-                    "parti": c.parti,
-                    "annonce_candidature": c.annonce_candidature,
-                    "retrait_candidature": c.retrait_candidature,
-                    "second_round": c.second_round,
-                    # results
-                    "intentions": r.get("intentions", ""),
-                    "erreur_sup": r.get("erreur_sup", ""),
-                    "erreur_inf": r.get("erreur_inf", ""),
-                }
-            )
+            yield {
+                # poll metadata
+                "poll_id": poll_id,
+                "hypothese": hyp,
+                "nom_institut": meta.get("nom_institut", ""),
+                "commanditaire": meta.get("commanditaire", ""),
+                "debut_enquete": meta.get("debut_enquete", ""),
+                "fin_enquete": meta.get("fin_enquete", ""),
+                "echantillon": meta.get("echantillon", ""),
+                "population": meta.get("population", ""),
+                "rolling": meta.get("rolling", ""),
+                "media": meta.get("media", ""),
+                "tour": meta.get("tour", ""),
+                "filename": meta.get("filename", ""),
+                # candidate info
+                "candidate_id": c.candidate_id,
+                "candidat": r.get("candidat", ""),
+                "complete_name": c.complete_name,
+                "name": c.name,
+                "surname": c.surname,
+                "parti": c.parti,
+                "annonce_candidature": c.annonce_candidature,
+                "retrait_candidature": c.retrait_candidature,
+                "second_round": c.second_round,
+                # results
+                "intentions": r.get("intentions", ""),
+                "erreur_sup": r.get("erreur_sup", ""),
+                "erreur_inf": r.get("erreur_inf", ""),
+            }
 
-    return merged
-
-
-def write_csv(rows: List[dict], out_path: Path) -> None:
-    if not rows:
-        # Write header only with a minimal schema
-        fieldnames = [
-            "poll_id",
-            "hypothese",
-            "nom_institut",
-            "commanditaire",
-            "debut_enquete",
-            "fin_enquete",
-            "echantillon",
-            "population",
-            "rolling",
-            "media",
-            "tour",
-            "filename",
-            "candidate_id",
-            "candidat",
-            "complete_name",
-            "name",
-            "surname",
-            "parti",
-            "annonce_candidature",
-            "retrait_candidature",
-            "second_round",
-            "intentions",
-            "erreur_sup",
-            "erreur_inf",
-        ]
-    else:
-        # Preserve column order based on our construction above
-        fieldnames = list(rows[0].keys())
+
+def merge(repo_root: Path = ROOT) -> List[dict]:
+    """Return merged rows as a list of dictionaries."""
+    return list(iter_merged_rows(repo_root))
+
+
+def write_csv(rows: Iterable[dict], out_path: Path) -> int:
+    """Write rows to out_path as they are produced and return the number written.
+
+    Rows go to a temporary file next to out_path, which only replaces it once every
+    row is written: an error raised while merging leaves the previous output intact.
+    """
+    row_values = itemgetter(*FIELDNAMES)
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    with out_path.open("w", encoding="utf-8", newline="") as f:
-        wr = csv.DictWriter(f, fieldnames=fieldnames)
-        wr.writeheader()
-        for row in rows:
-            wr.writerow(row)
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    count = 0
+    try:
+        with tmp_path.open("w", encoding="utf-8", newline="") as f:
+            wr = csv.writer(f)
+            wr.writerow(FIELDNAMES)
+            for row in rows:
+                wr.writerow(row_values(row))
+                count += 1
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return count
 
 
 def main(argv: List[str], dry_run=False) -> int:
     root = ROOT
     out = root / "presidentielle2027.csv"
-    rows = merge(root)
+    rows = iter_merged_rows(root)
     if dry_run:
         print("Dry run, not writing anything. No CSV, No JSON")
-        write_csv(rows, out)
-    print(f"Wrote {len(rows)} rows to {out.relative_to(root)}")
+        count = write_csv(rows, out)
+    else:
+        count = sum(1 for _ in rows)
+    print(f"Wrote {count} rows to {out.relative_to(root)}")
     return 0
 
 
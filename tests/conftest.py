@@ -1,8 +1,183 @@
 """Pytest configuration and shared fixtures."""
 
+import csv
+import importlib.util
+import json
+import os
+import shutil
 import sys
+from functools import lru_cache
 from pathlib import Path
+from types import SimpleNamespace
+from typing import FrozenSet, Iterator, List, NamedTuple, Tuple
+
+import pytest
+
+try:
+    import orjson
+except ImportError:  # optional, only speeds up loading the JSON output
+    orjson = None
 
 # Add project root to path for easier imports
 ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT))
+
+
+@lru_cache(maxsize=None)
+def list_poll_paths() -> Tuple[str, ...]:
+    """Paths of the CSV files in polls/, as sorted strings (scanned once per session)."""
+    with os.scandir(ROOT / "polls") as entries:
+        return tuple(sorted(e.path for e in entries if e.is_file() and e.name.endswith(".csv")))
+
+
+def pytest_generate_tests(metafunc):
+    """Parametrize tests taking a ``poll_path`` with the CSV files of polls/, as string paths.
+
+    The directory is only listed when a collected test actually asks for it.
+    """
+    if "poll_path" in metafunc.fixturenames:
+        metafunc.parametrize("poll_path", list_poll_paths(), ids=os.path.basename)
+
+
+class CsvTable(NamedTuple):
+    """A parsed CSV file: header and raw rows, accessed by column name."""
+
+    fieldnames: List[str]
+    rows: List[List[str]]
+
+    def column(self, name: str) -> Iterator[str]:
+        """Values of one column; blank and short rows are skipped."""
+        idx = self.fieldnames.index(name)
+        return (row[idx] for row in self.rows if idx < len(row))
+
+    def columns(self, *names: str) -> Iterator[Tuple[str, ...]]:
+        """Tuples of several columns; blank and short rows are skipped."""
+        indexes = [self.fieldnames.index(name) for name in names]
+        width = max(indexes)
+        return (tuple(row[i] for i in indexes) for row in self.rows if width < len(row))
+
+
+class PollColumns(NamedTuple):
+    """A poll CSV stored column-wise: header names and stripped values of the checked columns.
+
+    Missing cells (and missing columns) are empty strings; blank lines are skipped.
+    """
+
+    fieldnames: FrozenSet[str]
+    candidat: Tuple[str, ...]
+    intentions: Tuple[str, ...]
+    erreur_sup: Tuple[str, ...]
+    erreur_inf: Tuple[str, ...]
+
+
+def read_csv_table(path: Path) -> CsvTable:
+    with path.open("r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        fieldnames = next(reader, [])
+        return CsvTable(fieldnames, list(reader))
+
+
+@pytest.fixture(scope="session")
+def merge_module():
+    """merge.py, loaded once per test session."""
+    spec = importlib.util.spec_from_file_location("merge", ROOT / "merge.py")
+    mod = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    # Register module before loading to fix Python 3.13 dataclass issue
+    sys.modules["merge"] = mod
+    spec.loader.exec_module(mod)
+    return mod
+
+
+@pytest.fixture(scope="session")
+def prepared_repo(tmp_path_factory):
+    """Copy of the merge inputs (metadata CSVs and polls/), made once per test session.
+
+    Treat it as read-only: tests that modify the data copy it into their own tmp_path.
+    """
+    repo = tmp_path_factory.mktemp("repo")
+    for fname in ["candidats.csv", "hypotheses.csv", "polls.csv"]:
+        shutil.copy(ROOT / fname, repo / fname)
+    shutil.copytree(ROOT / "polls", repo / "polls")
+    return repo
+
+
+@pytest.fixture(scope="session")
+def merged_rows(merge_module, prepared_repo):
+    """Output of merge.merge() on the prepared repo, computed once per test session."""
+    return merge_module.merge(prepared_repo)
+
+
+@pytest.fixture(scope="session")
+def polls_rows():
+    """polls.csv, parsed once per test session."""
+    return read_csv_table(ROOT / "polls.csv")
+
+
+@pytest.fixture(scope="session")
+def hypotheses_rows():
+    """hypotheses.csv, parsed once per test session."""
+    return read_csv_table(ROOT / "hypotheses.csv")
+
+
+@pytest.fixture(scope="session")
+def candidats_rows():
+    """candidats.csv, parsed once per test session."""
+    return read_csv_table(ROOT / "candidats.csv")
+
+
+@pytest.fixture(scope="session")
+def polls_index(polls_rows):
+    """poll_id and hypothese columns of polls.csv, indexed in a single pass.
+
+    rows: stripped (poll_id, hypothese) tuples, in file order
+    poll_ids: set of non-empty poll_id values
+    poll_id_to_hyp: poll_id -> hypothese (first occurrence)
+    """
+    rows = [(poll_id.strip(), hyp.strip()) for poll_id, hyp in polls_rows.columns("poll_id", "hypothese")]
+    poll_id_to_hyp = {}
+    for poll_id, hyp in rows:
+        if poll_id:
+            poll_id_to_hyp.setdefault(poll_id, hyp)
+    return SimpleNamespace(rows=rows, poll_ids=set(poll_id_to_hyp), poll_id_to_hyp=poll_id_to_hyp)
+
+
+@pytest.fixture(scope="session")
+def hypothesis_ids_set(hypotheses_rows):
+    """Non-empty id_hypothese values of hypotheses.csv."""
+    return set(filter(None, map(str.strip, hypotheses_rows.column("id_hypothese"))))
+
+
+@pytest.fixture(scope="session")
+def valid_candidate_ids(candidats_rows):
+    """Non-empty candidate_id values of candidats.csv."""
+    return frozenset(filter(None, map(str.strip, candidats_rows.column("candidate_id"))))
+
+
+@pytest.fixture(scope="session")
+def poll_file_names():
+    """Names of the CSV files in polls/, from the shared directory scan."""
+    return frozenset(map(os.path.basename, list_poll_paths()))
+
+
+@pytest.fixture(scope="session")
+def parsed_polls():
+    """Every poll CSV parsed once per test session: poll_path -> PollColumns."""
+    parsed = {}
+    for poll_path in list_poll_paths():
+        with open(poll_path, encoding="utf-8", newline="") as f:
+            reader = csv.DictReader(f)
+            rows = list(reader)
+        columns = (tuple((row.get(name) or "").strip() for row in rows) for name in PollColumns._fields[1:])
+        parsed[poll_path] = PollColumns(frozenset(reader.fieldnames or ()), *columns)
+    return parsed
+
+
+@pytest.fixture(scope="session")
+def polls_json():
+    """presidentielle2027.json, loaded once per test session."""
+    json_path = ROOT / "presidentielle2027.json"
+    if not json_path.exists():
+        pytest.skip("presidentielle2027.json not found")
+    with json_path.open("rb") as f:
+        return orjson.loads(f.read()) if orjson is not None else json.load(f)
@@ -0,0 +1,35 @@
+"""Unit tests for the catalog diff in check_new_polls.py."""
+
+from check_new_polls import find_new_polls
+
+
+def catalog(*filenames, year="2025"):
+    return [{"filename": name, "year": year} for name in filenames]
+
+
+def filenames(polls):
+    return [poll["filename"] for poll in polls]
+
+
+def test_find_new_polls_without_any_referenced_poll():
+    """With nothing referenced in polls.csv, every covered catalog poll is new."""
+    polls = catalog("a.pdf", "b.pdf")
+    assert filenames(find_new_polls(polls, set())) == ["a.pdf", "b.pdf"]
+
+
+def test_find_new_polls_keeps_insertion_before_first_referenced_poll():
+    """A poll inserted ahead of every referenced one is still reported."""
+    polls = catalog("new.pdf", "a.pdf", "b.pdf")
+    assert filenames(find_new_polls(polls, {"a.pdf", "b.pdf"})) == ["new.pdf"]
+
+
+def test_find_new_polls_keeps_insertion_in_the_middle():
+    """A poll inserted between referenced ones is reported, in catalog order."""
+    polls = catalog("a.pdf", "new.pdf", "b.pdf", "latest.pdf")
+    assert filenames(find_new_polls(polls, {"a.pdf", "b.pdf"})) == ["new.pdf", "latest.pdf"]
+
+
+def test_find_new_polls_ignores_polls_before_tracking_start():
+    """Catalog polls older than the repository's coverage are not reported."""
+    polls = catalog("old.pdf", year="2021") + catalog("undated.pdf", year="") + catalog("new.pdf")
+    assert filenames(find_new_polls(polls, set(), min_year=2024)) == ["undated.pdf", "new.pdf"]
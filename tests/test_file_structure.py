@@ -1,7 +1,12 @@
 """Validate core file structure and encoding."""
 
+import ast
+import codecs
 import csv
+import io
+import os
 from pathlib import Path
+from types import SimpleNamespace
 
 import pytest
 
@@ -16,6 +21,17 @@ REQUIRED_FILES = [
     "merge.py",
 ]
 
+METADATA_CSVS = ["candidats.csv", "hypotheses.csv", "polls.csv"]
+
+
+def check_utf8(path, chunk_size=65536):
+    """Decode a file as UTF-8 chunk by chunk; raises UnicodeDecodeError if invalid."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            decoder.decode(chunk)
+    decoder.decode(b"", final=True)
+
 
 @pytest.mark.parametrize("filename", REQUIRED_FILES)
 def test_required_files_exist(filename):
@@ -24,29 +40,41 @@ def test_required_files_exist(filename):
     assert file_path.exists(), f"Required file missing: {filename}"
 
 
-@pytest.mark.parametrize("filename", ["candidats.csv", "hypotheses.csv", "polls.csv"])
-def test_csv_files_utf8_encoding(filename):
-    """All CSV files must be UTF-8 encoded."""
-    file_path = ROOT / filename
+@pytest.fixture(scope="session", params=METADATA_CSVS)
+def parsed_csv(request):
+    """Decode and parse a metadata CSV once for the encoding, structure and header tests.
+
+    Decoding and parsing errors are recorded rather than raised, so that each
+    test can report the one it is about.
+    """
+    filename = request.param
+    parsed = SimpleNamespace(filename=filename, header=None, rows=None, decode_error=None, csv_error=None)
     try:
-        with file_path.open("r", encoding="utf-8") as f:
-            f.read()
+        text = (ROOT / filename).read_bytes().decode("utf-8")
     except UnicodeDecodeError as e:
-        pytest.fail(f"File {filename} is not UTF-8 encoded: {e}")
+        parsed.decode_error = e
+        return parsed
+    reader = csv.reader(io.StringIO(text))
+    try:
+        parsed.header = next(reader, None)
+        parsed.rows = list(reader)
+    except csv.Error as e:
+        parsed.csv_error = e
+    return parsed
+
+
+def test_csv_files_utf8_encoding(parsed_csv):
+    """All CSV files must be UTF-8 encoded."""
+    if parsed_csv.decode_error:
+        pytest.fail(f"File {parsed_csv.filename} is not UTF-8 encoded: {parsed_csv.decode_error}")
 
 
-@pytest.mark.parametrize("filename", ["candidats.csv", "hypotheses.csv", "polls.csv"])
-def test_csv_files_valid_structure(filename):
+def test_csv_files_valid_structure(parsed_csv):
     """All CSV files must be valid and parseable."""
-    file_path = ROOT / filename
-    with file_path.open("r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        assert reader.fieldnames, f"{filename} has no header row"
-        # Try to read at least one row to ensure it's valid
-        try:
-            rows = list(reader)
-        except csv.Error as e:
-            pytest.fail(f"{filename} has invalid CSV structure: {e}")
+    assert parsed_csv.decode_error is None, f"{parsed_csv.filename} could not be decoded"
+    assert parsed_csv.header, f"{parsed_csv.filename} has no header row"
+    if parsed_csv.csv_error:
+        pytest.fail(f"{parsed_csv.filename} has invalid CSV structure: {parsed_csv.csv_error}")
 
 
 def test_polls_directory_exists():
@@ -56,21 +84,17 @@ def test_polls_directory_exists():
     assert polls_dir.is_dir(), "polls/ exists but is not a directory"
 
 
-def test_polls_directory_contains_csv_files():
+def test_polls_directory_contains_csv_files(poll_file_names):
     """The polls/ directory must contain at least one CSV file."""
-    polls_dir = ROOT / "polls"
-    csv_files = list(polls_dir.glob("*.csv"))
-    assert len(csv_files) > 0, "polls/ directory contains no CSV files"
+    assert poll_file_names, "polls/ directory contains no CSV files"
 
 
-@pytest.mark.parametrize("poll_path", list((ROOT / "polls").glob("*.csv")))
 def test_poll_files_utf8_encoding(poll_path):
     """All poll CSV files must be UTF-8 encoded."""
     try:
-        with poll_path.open("r", encoding="utf-8") as f:
-            f.read()
+        check_utf8(poll_path)
     except UnicodeDecodeError as e:
-        pytest.fail(f"Poll file {poll_path.name} is not UTF-8 encoded: {e}")
+        pytest.fail(f"Poll file {os.path.basename(poll_path)} is not UTF-8 encoded: {e}")
 
 
 def test_merge_script_is_executable():
@@ -78,11 +102,11 @@ def test_merge_script_is_executable():
     merge_path = ROOT / "merge.py"
     assert merge_path.exists()
 
-    # Try to compile it (syntax check)
+    # Try to parse it (syntax check, no bytecode needed)
     with merge_path.open("r", encoding="utf-8") as f:
         code = f.read()
     try:
-        compile(code, "merge.py", "exec")
+        ast.parse(code, filename="merge.py")
     except SyntaxError as e:
         pytest.fail(f"merge.py has syntax errors: {e}")
 
@@ -121,17 +145,13 @@ def test_github_workflows_exist():
     assert len(yml_files) > 0, ".github/workflows exists but has no workflow files"
 
 
-def test_no_duplicate_column_names_in_csvs():
+def test_no_duplicate_column_names_in_csvs(parsed_csv):
     """CSV files should not have duplicate column names."""
-    for csv_file in ["candidats.csv", "hypotheses.csv", "polls.csv"]:
-        file_path = ROOT / csv_file
-        with file_path.open("r", encoding="utf-8") as f:
-            reader = csv.reader(f)
-            header = next(reader)
-            seen = set()
-            duplicates = []
-            for col in header:
-                if col in seen:
-                    duplicates.append(col)
-                seen.add(col)
-            assert not duplicates, f"{csv_file} has duplicate columns: {duplicates}"
+    assert parsed_csv.header, f"{parsed_csv.filename} has no header row"
+    seen = set()
+    duplicates = []
+    for col in parsed_csv.header:
+        if col in seen:
+            duplicates.append(col)
+        seen.add(col)
+    assert not duplicates, f"{parsed_csv.filename} has duplicate columns: {duplicates}"
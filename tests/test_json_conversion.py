@@ -2,7 +2,6 @@
 """
 Test the CSV to JSON conversion script.
 """
-import json
 from pathlib import Path
 from csv_to_json import csv_to_json, convert_to_int_or_float
 
@@ -29,14 +28,9 @@ def test_json_file_exists():
     assert json_path.exists(), "presidentielle2027.json should exist"
 
 
-def test_json_structure_valid():
+def test_json_structure_valid(polls_json):
     """Test that the JSON file has valid structure."""
-    json_path = ROOT / "presidentielle2027.json"
-    if not json_path.exists():
-        pytest.skip("presidentielle2027.json not found")
-
-    with json_path.open("r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = polls_json
 
     assert isinstance(data, list), "JSON should be a list of polls"
 
@@ -67,13 +61,12 @@ def test_json_structure_valid():
             ), f"Candidat missing keys: {candidat_required - set(candidat.keys())}"
 
 
-def test_json_poll_count_matches_csv():
+def test_json_poll_count_matches_csv(polls_json):
     """Test that JSON has same number of polls as CSV."""
     csv_path = ROOT / "presidentielle2027.csv"
-    json_path = ROOT / "presidentielle2027.json"
 
-    if not csv_path.exists() or not json_path.exists():
-        pytest.skip("CSV or JSON file not found")
+    if not csv_path.exists():
+        pytest.skip("presidentielle2027.csv not found")
 
     # Count unique poll_ids in CSV
     import csv
@@ -85,8 +78,7 @@ def test_json_poll_count_matches_csv():
             poll_ids.add(row["poll_id"])
 
     # Count polls in JSON
-    with json_path.open("r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = polls_json
 
     assert len(data) == len(poll_ids), f"JSON has {len(data)} polls but CSV has {len(poll_ids)} unique poll_ids"
 
@@ -100,34 +92,18 @@ def test_convert_to_int_or_float():
     assert convert_to_int_or_float("invalid") is None
 
 
-def test_json_intentions_are_numeric():
-    """Test that intentions in JSON are numeric (int or float) or None."""
-    json_path = ROOT / "presidentielle2027.json"
-    if not json_path.exists():
-        pytest.skip("presidentielle2027.json not found")
+NUMERIC_OR_NONE = {int, float, type(None)}
 
-    with json_path.open("r", encoding="utf-8") as f:
-        data = json.load(f)
 
-    for poll in data:
-        for candidat in poll["candidats"]:
-            intentions = candidat.get("intentions")
-            assert intentions is None or isinstance(
-                intentions, (int, float)
-            ), f"intentions should be int, float, or None, got {type(intentions)}: {intentions}"
+def test_json_intentions_are_numeric(polls_json):
+    """Test that intentions in JSON are numeric (int or float) or None."""
+    types = {type(candidat.get("intentions")) for poll in polls_json for candidat in poll["candidats"]}
+    bad = types - NUMERIC_OR_NONE
+    assert not bad, f"intentions should be int, float, or None, got {sorted(t.__name__ for t in bad)}"
 
 
-def test_json_echantillon_is_numeric():
+def test_json_echantillon_is_numeric(polls_json):
     """Test that echantillon in JSON is numeric or None."""
-    json_path = ROOT / "presidentielle2027.json"
-    if not json_path.exists():
-        pytest.skip("presidentielle2027.json not found")
-
-    with json_path.open("r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    for poll in data:
-        echantillon = poll.get("echantillon")
-        assert echantillon is None or isinstance(
-            echantillon, (int, float)
-        ), f"echantillon should be int, float, or None, got {type(echantillon)}: {echantillon}"
+    types = {type(poll.get("echantillon")) for poll in polls_json}
+    bad = types - NUMERIC_OR_NONE
+    assert not bad, f"echantillon should be int, float, or None, got {sorted(t.__name__ for t in bad)}"
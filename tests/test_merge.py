@@ -1,39 +1,20 @@
 import csv
-import sys
-from pathlib import Path
-
+import os
 import shutil
+from collections import Counter
+from operator import itemgetter
+from pathlib import Path
 
-import importlib.util
-
-
-ROOT = Path(__file__).resolve().parents[1]
-
-
-def load_merge_module():
-    spec = importlib.util.spec_from_file_location("merge", ROOT / "merge.py")
-    mod = importlib.util.module_from_spec(spec)
-    assert spec.loader is not None
-    # Register module before loading to fix Python 3.13 dataclass issue
-    sys.modules["merge"] = mod
-    spec.loader.exec_module(mod)
-    return mod
+import pytest
 
 
-def test_merge_runs_and_produces_csv(tmp_path: Path):
+def test_merge_runs_and_produces_csv(tmp_path: Path, merge_module, prepared_repo):
     """Verify merge.py executes and produces the expected CSV."""
-    # Copy minimal repo into tmp to avoid writing in working tree
-    for fname in ["candidats.csv", "hypotheses.csv", "polls.csv"]:
-        shutil.copy(ROOT / fname, tmp_path / fname)
-    # Copy polls directory
-    shutil.copytree(ROOT / "polls", tmp_path / "polls")
-
-    merge = load_merge_module()
-    rows = merge.merge(tmp_path)
+    rows = merge_module.merge(prepared_repo)
     assert rows, "Merged rows should not be empty"
 
     out = tmp_path / "presidentielle2027.csv"
-    merge.write_csv(rows, out)
+    merge_module.write_csv(rows, out)
     assert out.exists(), "Output CSV must be written"
 
     with out.open("r", encoding="utf-8") as f:
@@ -44,34 +25,32 @@ def test_merge_runs_and_produces_csv(tmp_path: Path):
         assert "intentions" in first
 
 
-def test_add_new_poll_file_updates_merge(tmp_path: Path):
+def test_add_new_poll_file_updates_merge(tmp_path: Path, merge_module, prepared_repo):
     """Verify that adding a new poll increases merged row count."""
-    # Arrange: copy base data
-    for fname in ["candidats.csv", "hypotheses.csv", "polls.csv"]:
-        shutil.copy(ROOT / fname, tmp_path / fname)
-    shutil.copytree(ROOT / "polls", tmp_path / "polls")
+    # Arrange: writable copy of the base data
+    shutil.copytree(prepared_repo, tmp_path, dirs_exist_ok=True)
 
-    merge = load_merge_module()
-    base_rows = merge.merge(tmp_path)
+    base_rows = merge_module.merge(tmp_path)
     base_count = len(base_rows)
 
     # Add a synthetic new poll by duplicating an existing metadata row with new id
     polls_csv = tmp_path / "polls.csv"
-    with polls_csv.open("r", encoding="utf-8") as f:
-        rows = list(csv.DictReader(f))
-    assert rows, "polls.csv must have rows"
-    new_meta = dict(rows[0])
+    with polls_csv.open("r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        first = next(reader, None)
+    assert first, "polls.csv must have rows"
+    new_meta = dict(first)
     new_meta["poll_id"] = "20990101_0101_xx_A"  # future id to avoid collision
-    # Append to polls.csv
-    fieldnames = list(rows[0].keys())
     new_meta["hypothese"] = "H5"  # ensure valid hypothesis
 
-    with polls_csv.open("w", encoding="utf-8", newline="") as f:
-        wr = csv.DictWriter(f, fieldnames=fieldnames)
-        wr.writeheader()
-        for r in rows:
-            wr.writerow(r)
-        wr.writerow(new_meta)
+    # Append to polls.csv, ending its last line first if the final newline was stripped
+    with polls_csv.open("rb") as f:
+        f.seek(-1, os.SEEK_END)
+        missing_newline = f.read(1) != b"\n"
+    with polls_csv.open("a", encoding="utf-8", newline="") as f:
+        if missing_newline:
+            f.write("\n")
+        csv.DictWriter(f, fieldnames=reader.fieldnames, lineterminator="\n").writerow(new_meta)
 
     # Create results file by copying a specific poll that matches H5 hypothesis
     # Use 20240707_0708_hi_D.csv which has the correct candidates for H5
@@ -85,19 +64,12 @@ def test_add_new_poll_file_updates_merge(tmp_path: Path):
     )
 
     # Act: re-merge
-    rows_after = merge.merge(tmp_path)
+    rows_after = merge_module.merge(tmp_path)
     assert len(rows_after) > base_count, "Merged rows should increase after adding a poll"
 
 
-def test_merged_output_has_expected_columns(tmp_path: Path):
+def test_merged_output_has_expected_columns(merged_rows):
     """Verify the merged CSV contains all expected columns."""
-    for fname in ["candidats.csv", "hypotheses.csv", "polls.csv"]:
-        shutil.copy(ROOT / fname, tmp_path / fname)
-    shutil.copytree(ROOT / "polls", tmp_path / "polls")
-
-    merge = load_merge_module()
-    rows = merge.merge(tmp_path)
-
     # Expected columns based on merge.py implementation
     expected = {
         "poll_id",
@@ -123,8 +95,8 @@ def test_merged_output_has_expected_columns(tmp_path: Path):
         "erreur_inf",
     }
 
-    if rows:
-        actual = set(rows[0].keys())
+    if merged_rows:
+        actual = set(merged_rows[0].keys())
         missing = expected - actual
         extra = actual - expected
         assert not missing, f"Merged output missing columns: {missing}"
@@ -133,60 +105,31 @@ def test_merged_output_has_expected_columns(tmp_path: Path):
             print(f"Note: Merged output has extra columns: {extra}")
 
 
-def test_merged_output_has_no_duplicates(tmp_path: Path):
+def test_merged_output_has_no_duplicates(merged_rows):
     """Verify the merged CSV has no duplicate rows."""
-    for fname in ["candidats.csv", "hypotheses.csv", "polls.csv"]:
-        shutil.copy(ROOT / fname, tmp_path / fname)
-    shutil.copytree(ROOT / "polls", tmp_path / "polls")
-
-    merge = load_merge_module()
-    rows = merge.merge(tmp_path)
-
     # Create a signature for each row (poll_id + candidate_id should be unique)
-    signatures = set()
-    for row in rows:
-        sig = (row.get("poll_id"), row.get("candidate_id"))
-        assert sig not in signatures, f"Duplicate row found: poll={sig[0]}, candidate={sig[1]}"
-        signatures.add(sig)
+    signatures = list(map(itemgetter("poll_id", "candidate_id"), merged_rows))
+    if len(set(signatures)) != len(signatures):
+        sig, _ = Counter(signatures).most_common(1)[0]
+        pytest.fail(f"Duplicate row found: poll={sig[0]}, candidate={sig[1]}")
 
 
-def test_merged_output_candidate_references_valid(tmp_path: Path):
+def test_merged_output_candidate_references_valid(merged_rows, valid_candidate_ids):
     """Verify all candidate_id references in merged output exist in candidats.csv."""
-    for fname in ["candidats.csv", "hypotheses.csv", "polls.csv"]:
-        shutil.copy(ROOT / fname, tmp_path / fname)
-    shutil.copytree(ROOT / "polls", tmp_path / "polls")
-
-    # Load valid candidate IDs
-    valid_candidates = set()
-    with (tmp_path / "candidats.csv").open("r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            cid = row.get("candidate_id", "").strip()
-            if cid:
-                valid_candidates.add(cid)
-
-    merge = load_merge_module()
-    rows = merge.merge(tmp_path)
-
-    for row in rows:
-        cid = row.get("candidate_id")
+    # Columns are guaranteed by test_merged_output_has_expected_columns
+    for cid, poll_id in map(itemgetter("candidate_id", "poll_id"), merged_rows):
+        if cid in valid_candidate_ids:
+            continue
         # Note: merge.py has fallback logic that generates IDs for unknown candidates
         # So we just check that candidate_id is not empty
-        assert cid, f"Empty candidate_id in merged output for poll {row.get('poll_id')}"
+        assert cid, f"Empty candidate_id in merged output for poll {poll_id}"
 
 
-def test_merged_output_is_not_empty(tmp_path: Path):
+def test_merged_output_is_not_empty(merged_rows, prepared_repo):
     """Verify the merged output contains data rows."""
-    for fname in ["candidats.csv", "hypotheses.csv", "polls.csv"]:
-        shutil.copy(ROOT / fname, tmp_path / fname)
-    shutil.copytree(ROOT / "polls", tmp_path / "polls")
-
-    merge = load_merge_module()
-    rows = merge.merge(tmp_path)
-
-    assert len(rows) > 0, "Merged output should not be empty"
+    assert len(merged_rows) > 0, "Merged output should not be empty"
 
     # Verify we have at least as many rows as there are poll files × average candidates
-    poll_files = list((tmp_path / "polls").glob("*.csv"))
+    poll_files = list((prepared_repo / "polls").glob("*.csv"))
     min_expected = len(poll_files)  # At least 1 candidate per poll
-    assert len(rows) >= min_expected, f"Expected at least {min_expected} rows but got {len(rows)}"
+    assert len(merged_rows) >= min_expected, f"Expected at least {min_expected} rows but got {len(merged_rows)}"
@@ -2,12 +2,17 @@
 """Update the poll count badge in README.md"""
 
 from pathlib import Path
+import os
 import re
 
+# Poll count badge in README.md
+_BADGE_RE = re.compile(r"!\[Sondages agrégés\]\(https://img\.shields\.io/badge/sondages_agrégés-\d+-blue\)")
+
 
 def count_polls(polls_dir: Path) -> int:
     """Count the number of poll CSV files."""
-    return len(list(polls_dir.glob("*.csv")))
+    with os.scandir(polls_dir) as entries:
+        return sum(1 for e in entries if e.is_file() and e.name.endswith(".csv"))
 
 
 def update_readme_badge(readme_path: Path, count: int) -> bool:
@@ -17,11 +22,12 @@ def update_readme_badge(readme_path: Path, count: int) -> bool:
     """
     content = readme_path.read_text(encoding="utf-8")
 
-    # Pattern to match the badge
-    pattern = r"!\[Sondages agrégés\]\(https://img\.shields\.io/badge/sondages_agrégés-\d+-blue\)"
     replacement = f"![Sondages agrégés](https://img.shields.io/badge/sondages_agrégés-{count}-blue)"
+    # Badge already showing this count: nothing to substitute
+    if replacement in content:
+        return False
 
-    new_content = re.sub(pattern, replacement, content)
+    new_content = _BADGE_RE.sub(replacement, content)
 
     if new_content != content:
         readme_path.write_text(new_content, encoding="utf-8")